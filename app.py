@@ -1,7 +1,9 @@
 import streamlit as st
 import io
 import time
-from translator import PDFTranslator
+import uuid
+from translator import PDFTranslator, join_translation
+from incremental import load_pairs, dump_pairs
 
 # Page configuration
 st.set_page_config(
@@ -222,6 +224,14 @@ if 'translation_result' not in st.session_state:
     st.session_state.translation_result = None
 if 'original_text' not in st.session_state:
     st.session_state.original_text = None
+if 'translation_pairs' not in st.session_state:
+    st.session_state.translation_pairs = None
+if 'incremental_report' not in st.session_state:
+    st.session_state.incremental_report = None
+if 'usage_summary' not in st.session_state:
+    st.session_state.usage_summary = None
+if 'user_id' not in st.session_state:
+    st.session_state.user_id = uuid.uuid4().hex
 
 def initialize_translator():
     """Initialize the translator with error handling"""
@@ -316,6 +326,13 @@ def main():
                 else:
                     st.warning("⚠️ Please initialize the translator first")
             
+            # Optional previous run for incremental re-translation
+            previous_file = st.file_uploader(
+                "Previous translation pairs (optional)",
+                type="json",
+                help="Upload the pairs JSON from an earlier run to re-translate only changed sentences"
+            )
+            
             # Translation button
             if st.button("🔄 Translate PDF", type="primary", disabled=st.session_state.translator is None):
                 if st.session_state.translator is None:
@@ -329,19 +346,44 @@ def main():
                         progress_bar = st.progress(0)
                         status_text = st.empty()
                         
+                        # Shared scheduler job so progress can show queue position
+                        scheduler = st.session_state.translator.scheduler
+                        job = scheduler.create_job(user=st.session_state.user_id)
+                        
                         def update_progress(current, total):
                             progress = current / total
                             progress_bar.progress(progress)
-                            status_text.text(f"Translating... {current}/{total} chunks processed")
+                            stats = scheduler.job_stats(job.job_id) or {}
+                            eta = stats.get("eta_seconds")
+                            eta_text = f" (about {eta:.0f}s remaining)" if eta else ""
+                            status_text.text(f"Translating... {current}/{total} chunks processed{eta_text}")
                         
                         # Perform translation
-                        with st.spinner("Translating document..."):
-                            translation_result = st.session_state.translator.translate_pdf(
-                                uploaded_file, 
-                                progress_callback=update_progress
-                            )
+                        try:
+                            with st.spinner("Translating document..."):
+                                if previous_file is not None:
+                                    pairs, report = st.session_state.translator.translate_pdf_incremental(
+                                        uploaded_file,
+                                        load_pairs(previous_file),
+                                        progress_callback=update_progress,
+                                        job=job
+                                    )
+                                else:
+                                    text = st.session_state.translator.extract_text_from_pdf(uploaded_file)
+                                    pairs = st.session_state.translator.translate_chunks(
+                                        text,
+                                        progress_callback=update_progress,
+                                        job=job
+                                    )
+                                    report = None
+                        finally:
+                            scheduler.close_job(job)
                         
-                        st.session_state.translation_result = translation_result
+                        st.session_state.usage_summary = job.usage.summary() if job.usage else None
+                        
+                        st.session_state.translation_pairs = pairs
+                        st.session_state.incremental_report = report
+                        st.session_state.translation_result = join_translation(pairs)
                         progress_bar.progress(1.0)
                         status_text.text("✅ Translation completed!")
                         
@@ -374,6 +416,24 @@ def main():
                 type="primary"
             )
             
+            # Pairs for a later incremental run
+            st.download_button(
+                label="📥 Download Translation Pairs",
+                data=dump_pairs(st.session_state.translation_pairs or []),
+                file_name="translation_pairs.json",
+                mime="application/json"
+            )
+            
+            # Incremental report
+            report = st.session_state.incremental_report
+            if report:
+                st.info(f"♻️ Reused {report['reused']} of {report['total_chunks']} sentences, "
+                        f"re-translated {len(report['retranslated'])}")
+                if report['retranslated']:
+                    with st.expander("Re-translated sentences"):
+                        for item in report['retranslated']:
+                            st.markdown(f"**#{item['index'] + 1}** {item['english']}")
+            
             # Statistics
             original_length = len(st.session_state.original_text) if st.session_state.original_text else 0
             translated_length = len(st.session_state.translation_result)
@@ -383,6 +443,17 @@ def main():
                 st.metric("Original Length", f"{original_length:,} chars")
             with col_stat2:
                 st.metric("Translated Length", f"{translated_length:,} chars")
+            
+            # Token usage
+            usage = st.session_state.usage_summary
+            if usage:
+                col_stat3, col_stat4, col_stat5 = st.columns(3)
+                with col_stat3:
+                    st.metric("Tokens Used", f"{usage['total_tokens']:,}")
+                with col_stat4:
+                    st.metric("LLM / Tool Calls", f"{usage['llm_calls']} / {usage['tool_calls']}")
+                with col_stat5:
+                    st.metric("Fallback Chunks", usage['fallbacks'])
                 
         else:
             st.info("🔄 Upload a PDF and click 'Translate PDF' to see results here")
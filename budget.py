@@ -0,0 +1,177 @@
+"""
+Token accounting and per-document budgets for LLM calls
+"""
+
+from langchain_core.callbacks import BaseCallbackHandler
+import threading
+import time
+import os
+
+
+def _env_limit(name, default=None, cast=int):
+    """Read a limit from the environment; 0 or empty means unlimited"""
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    value = cast(value)
+    return value or None
+
+
+class BudgetExceeded(Exception):
+    """Raised when a chunk or document runs past one of its limits"""
+
+
+class Budget:
+    """Limits on tokens, agent iterations and wall time"""
+
+    def __init__(self, max_tokens_per_chunk=None, max_tokens_per_document=None,
+                 max_iterations=5, max_seconds_per_chunk=None, max_seconds_per_document=None):
+        self.max_tokens_per_chunk = max_tokens_per_chunk
+        self.max_tokens_per_document = max_tokens_per_document
+        self.max_iterations = max_iterations
+        self.max_seconds_per_chunk = max_seconds_per_chunk
+        self.max_seconds_per_document = max_seconds_per_document
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            max_tokens_per_chunk=_env_limit("BUDGET_TOKENS_PER_CHUNK", 20000),
+            max_tokens_per_document=_env_limit("BUDGET_TOKENS_PER_DOCUMENT"),
+            max_iterations=_env_limit("BUDGET_AGENT_ITERATIONS", 5),
+            max_seconds_per_chunk=_env_limit("BUDGET_SECONDS_PER_CHUNK", 60, float),
+            max_seconds_per_document=_env_limit("BUDGET_SECONDS_PER_DOCUMENT", None, float),
+        )
+
+
+class Usage:
+    """Token counts summed over one or more LLM calls"""
+
+    def __init__(self):
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.total_tokens = 0
+        self.llm_calls = 0
+        self.tool_calls = 0
+
+    def add(self, other):
+        self.input_tokens += other.input_tokens
+        self.output_tokens += other.output_tokens
+        self.total_tokens += other.total_tokens
+        self.llm_calls += other.llm_calls
+        self.tool_calls += other.tool_calls
+
+    def as_dict(self):
+        return {
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "total_tokens": self.total_tokens,
+            "llm_calls": self.llm_calls,
+            "tool_calls": self.tool_calls,
+        }
+
+
+class UsageTracker:
+    """Per-chunk and per-document accounting against a Budget"""
+
+    def __init__(self, budget=None):
+        self.budget = budget or Budget()
+        self.usage = Usage()
+        self.chunks = []
+        self.fallbacks = 0
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def add(self, usage):
+        with self._lock:
+            self.usage.add(usage)
+
+    def record_chunk(self, chunk, usage, fallback_reason=None):
+        with self._lock:
+            if fallback_reason:
+                self.fallbacks += 1
+            self.chunks.append({
+                "english": chunk,
+                "fallback": fallback_reason,
+                **usage.as_dict(),
+            })
+
+    def exceeded(self):
+        """Why the document is over budget, or None"""
+        budget = self.budget
+        with self._lock:
+            if budget.max_tokens_per_document and self.usage.total_tokens >= budget.max_tokens_per_document:
+                return "document token budget exceeded"
+        if budget.max_seconds_per_document and time.monotonic() - self.started >= budget.max_seconds_per_document:
+            return "document time budget exceeded"
+        return None
+
+    def summary(self):
+        with self._lock:
+            return {
+                **self.usage.as_dict(),
+                "chunks": len(self.chunks),
+                "fallbacks": self.fallbacks,
+                "elapsed_seconds": time.monotonic() - self.started,
+            }
+
+
+class UsageCallbackHandler(BaseCallbackHandler):
+    """
+    Collects usage metadata from every LLM call in a chunk's run.
+
+    With a tracker it also enforces the chunk and document token budgets by
+    raising BudgetExceeded before the next LLM or tool call starts, which
+    aborts the agent's tool loop without discarding an answer it already has.
+    """
+
+    raise_error = True
+
+    def __init__(self, tracker=None, enforce=True):
+        self.usage = Usage()
+        self.tracker = tracker
+        self.enforce = enforce
+        self._lock = threading.Lock()
+
+    def check(self):
+        """Raise BudgetExceeded if the chunk or document is over budget"""
+        if not self.enforce or not self.tracker:
+            return
+        budget = self.tracker.budget
+        with self._lock:
+            chunk_tokens = self.usage.total_tokens
+        if budget.max_tokens_per_chunk and chunk_tokens >= budget.max_tokens_per_chunk:
+            raise BudgetExceeded("chunk token budget exceeded")
+        reason = self.tracker.exceeded()
+        if reason:
+            raise BudgetExceeded(reason)
+
+    def on_llm_start(self, serialized, prompts, **kwargs):
+        self.check()
+
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        self.check()
+
+    def on_llm_end(self, response, **kwargs):
+        call = Usage()
+        call.llm_calls = 1
+        for generations in response.generations:
+            for generation in generations:
+                metadata = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if metadata:
+                    call.input_tokens += metadata.get("input_tokens", 0)
+                    call.output_tokens += metadata.get("output_tokens", 0)
+                    call.total_tokens += metadata.get("total_tokens", 0)
+
+        with self._lock:
+            self.usage.add(call)
+        if self.tracker:
+            self.tracker.add(call)
+
+    def on_tool_start(self, serialized, input_str, **kwargs):
+        self.check()
+        with self._lock:
+            self.usage.tool_calls += 1
+        if self.tracker:
+            tool_call = Usage()
+            tool_call.tool_calls = 1
+            self.tracker.add(tool_call)
@@ -0,0 +1,147 @@
+"""
+Placeholder protection for spans that should not go through the LLM
+"""
+
+import re
+import os
+
+PLACEHOLDER = "⟦{}⟧"
+PLACEHOLDER_RE = re.compile(r"⟦\s*(\d+)\s*⟧")
+
+# Honorifics end in a dot too, but never start a case type ("Mr. No. 1 fan")
+HONORIFICS = r"(?:Mr|Mrs|Ms|Dr|Sri|Smt|Shri|Kum|Prof|Hon)\."
+
+# Identifiers inside a matched reference. Each becomes its own placeholder, so
+# connectives between them ("and", "to", "of") are translated by the model
+NUMBER = re.compile(r"\d+")
+PROVISION = re.compile(r"\d+[A-Z]*(?:-[A-Z]+)?(?:\s?\(\w+\))*")
+
+# (pattern, item pattern) pairs. The "value" group (or whole match) is copied
+# through untranslated, split into items when an item pattern is given
+PATTERNS = [
+    # I.T.T.A.Nos.10, 12 and 19 of 1999 / W.P. No. 1234 of 2010 / Crl.A. No. 5: only the
+    # numbers are protected, the case type is transliterated. It must be dotted
+    # abbreviations, so "THE HIGH COURT No 5" is left alone
+    (re.compile(
+        r"\b(?:(?!" + HONORIFICS + r")[A-Z][A-Za-z]{0,5}\.\s?){1,6}Nos?\.?\s?"
+        r"(?P<value>\d+(?:\s*(?:,|and|&)\s*\d+)*(?:\s*(?:of|/)\s*\d{4})?)"
+    ), NUMBER),
+    # Section 260-A, Sections 132(4A) and 158BC: the keyword itself is translated
+    (re.compile(
+        r"(?i:\b(?:sections?|sec\.|articles?|art\.|rules?|clauses?))\s+"
+        r"(?P<value>\d+[A-Z]*(?:-[A-Z]+)?(?:\s?\(\w+\))*"
+        r"(?:\s*(?:,|and|to|&)\s*\d+[A-Z]*(?:-[A-Z]+)?(?:\s?\(\w+\))*)*)"
+    ), PROVISION),
+    # 31.07.2014, 1/4/99
+    (re.compile(r"\b\d{1,2}[./-]\d{1,2}[./-]\d{2,4}\b"), None),
+    # Rs. 5,00,000/-, Rs.50000: the currency word is translated
+    (re.compile(
+        r"(?i:(?:\bRs\.?|\bINR|₹))\s*"
+        r"(?P<value>\d+(?:,\d{2,3})*(?:\.\d+)?(?:/-)?)(?!\w|,\d)"
+    ), None),
+]
+
+
+class ProtectedText:
+    """A chunk with placeholders, and what each placeholder stands for"""
+
+    def __init__(self, text, values):
+        self.text = text
+        self.values = values
+
+    def restore(self, translation):
+        """Put the protected values back; returns (text, missing placeholder ids)"""
+        found = set()
+
+        def replace(match):
+            key = int(match.group(1))
+            if key not in self.values:
+                return match.group(0)
+            found.add(key)
+            return self.values[key]
+
+        restored = PLACEHOLDER_RE.sub(replace, translation)
+        return restored, sorted(set(self.values) - found)
+
+
+class EntityProtector:
+    """
+    Finds case numbers, section references, dates, amounts, exact glossary
+    terms and, if labels are configured, named entities, and swaps them for
+    placeholders before translation.
+
+    Glossary terms are restored as their Telugu equivalent; everything else
+    is restored verbatim.
+    """
+
+    def __init__(self, nlp, glossary, labels=None, min_glossary_words=None, batch_size=64):
+        self.nlp = nlp
+        self.batch_size = batch_size
+        # Off by default: names read better transliterated by the model than copied in Latin script
+        if labels is None:
+            labels = os.getenv("PROTECTED_ENTITY_LABELS", "").split(",")
+        self.labels = {label.strip() for label in labels if label.strip()}
+        min_words = min_glossary_words or int(os.getenv("GLOSSARY_PREFILL_MIN_WORDS", 2))
+
+        # Single words are too ambiguous to prefill without grammar (e.g. "Act", "B")
+        self.glossary = {
+            term.lower(): telugu for term, telugu in glossary.items()
+            if telugu and telugu != "nan" and len(term.split()) >= min_words
+        }
+        terms = sorted(self.glossary, key=len, reverse=True)
+        self.glossary_re = re.compile(
+            r"\b(?:" + "|".join(re.escape(term) for term in terms) + r")\b", re.IGNORECASE
+        ) if terms else None
+
+    def _ner_spans(self, chunks):
+        """Named entities for every chunk, in batches through nlp.pipe"""
+        if "ner" not in self.nlp.pipe_names or not self.labels:
+            return [[] for _ in chunks]
+        disable = [name for name in self.nlp.pipe_names if name not in ("tok2vec", "ner")]
+        return [
+            [(ent.start_char, ent.end_char, ent.text) for ent in doc.ents if ent.label_ in self.labels]
+            for doc in self.nlp.pipe(chunks, batch_size=self.batch_size, disable=disable)
+        ]
+
+    def detect(self, chunks):
+        """Protected spans (start, end, restore value) for each chunk"""
+        results = []
+        for chunk, ner_spans in zip(chunks, self._ner_spans(chunks)):
+            # Earlier sources win when spans overlap
+            candidates = []
+            for pattern, item in PATTERNS:
+                for match in pattern.finditer(chunk):
+                    group = "value" if "value" in pattern.groupindex else 0
+                    start, value = match.start(group), match.group(group)
+                    if item is None:
+                        candidates.append((start, match.end(group), value))
+                        continue
+                    for part in item.finditer(value):
+                        candidates.append((start + part.start(), start + part.end(), part.group(0)))
+            if self.glossary_re:
+                for match in self.glossary_re.finditer(chunk):
+                    candidates.append((match.start(), match.end(), self.glossary[match.group(0).lower()]))
+            candidates.extend(ner_spans)
+
+            spans = []
+            for start, end, value in candidates:
+                if start < end and all(end <= s or start >= e for s, e, _ in spans):
+                    spans.append((start, end, value))
+            results.append(sorted(spans))
+        return results
+
+    @staticmethod
+    def protect(chunk, spans):
+        """Replace spans in chunk with numbered placeholders"""
+        if "⟦" in chunk:
+            return ProtectedText(chunk, {})
+        parts = []
+        values = {}
+        last = 0
+        for key, (start, end, value) in enumerate(spans, 1):
+            parts.append(chunk[last:start])
+            parts.append(PLACEHOLDER.format(key))
+            values[key] = value
+            last = end
+        parts.append(chunk[last:])
+        return ProtectedText("".join(parts), values)
@@ -0,0 +1,284 @@
+"""
+Translation example retrieval from the MongoDB vector store
+"""
+
+from concurrent.futures import ThreadPoolExecutor, wait
+from collections import OrderedDict
+from pymongo import MongoClient
+import threading
+import logging
+import re
+import time
+import math
+import os
+
+# Only the fields the agent needs travel over the wire
+EXAMPLE_PROJECTION = {"_id": 0, "english_text": 1, "telugu_text": 1}
+
+logger = logging.getLogger(__name__)
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def _env_int(name, default):
+    return int(os.getenv(name, default))
+
+
+def get_client():
+    """Return the process-wide pooled MongoClient, or None if not configured"""
+    global _client
+    uri = os.getenv("MONGODB_URI")
+    if not uri:
+        return None
+
+    with _client_lock:
+        if _client is None:
+            timeout_ms = _env_int("MONGODB_TIMEOUT_MS", 2000)
+            _client = MongoClient(
+                uri,
+                maxPoolSize=_env_int("MONGODB_MAX_POOL_SIZE", 50),
+                minPoolSize=_env_int("MONGODB_MIN_POOL_SIZE", 0),
+                serverSelectionTimeoutMS=timeout_ms,
+                connectTimeoutMS=timeout_ms,
+                socketTimeoutMS=timeout_ms,
+                waitQueueTimeoutMS=timeout_ms,
+                retryWrites=True,
+            )
+        return _client
+
+
+def normalize_query(sentence):
+    """
+    Canonical form of a query, so prefetched sentences and the agent's own
+    tool inputs share cache entries
+    """
+    text = re.sub(r'\s+', ' ', str(sentence)).strip().strip("\"'")
+    text = re.sub(r'^english\s*:\s*', '', text, flags=re.IGNORECASE)
+    return text
+
+
+def get_collection():
+    """Return the examples collection on the shared client, or None"""
+    try:
+        client = get_client()
+        if client is None:
+            return None
+        db = client[os.getenv("MONGODB_DB", "translations")]
+        return db[os.getenv("MONGODB_COLLECTION", "memory")]
+    except Exception as e:
+        logger.warning("MongoDB connection failed: %s", e)
+        return None
+
+
+class CircuitBreaker:
+    """
+    Stops calling a failing backend until it has had time to recover.
+
+    After reset_timeout a single probe call is let through; its outcome
+    closes the breaker or opens it again.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self.opened_at is None:
+                return "closed"
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                return "half-open"
+            return "open"
+
+    def allow(self):
+        """Whether a call should be attempted right now; claims the probe when half-open"""
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.reset_timeout or self._probing:
+                return False
+            self._probing = True
+            logger.info("Example store circuit breaker half-open, probing")
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self.opened_at is not None:
+                logger.info("Example store circuit breaker closed")
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._probing or (self.opened_at is None and self.failures >= self.failure_threshold):
+                # (Re)open, including after a failed half-open probe
+                logger.warning("Example store circuit breaker opened after %d failures", self.failures)
+                self.opened_at = time.monotonic()
+            self._probing = False
+
+
+class ExampleStore:
+    """Vector search over stored English-Telugu pairs with batching and caching"""
+
+    def __init__(self, collection, model, k=5, max_workers=None, timeout=None,
+                 breaker=None, cache_size=10000):
+        self.collection = collection
+        self.model = model
+        self.k = k
+        self.timeout = timeout if timeout is not None else _env_int("MONGODB_TIMEOUT_MS", 2000) / 1000
+        self.breaker = breaker or CircuitBreaker(
+            failure_threshold=_env_int("MONGODB_BREAKER_FAILURES", 5),
+            reset_timeout=_env_int("MONGODB_BREAKER_RESET_S", 30),
+        )
+        self.max_workers = max_workers or _env_int("MONGODB_SEARCH_WORKERS", 8)
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="examples")
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def _cache_get(self, key):
+        with self._cache_lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        return None
+
+    def _cache_put(self, key, value):
+        with self._cache_lock:
+            self._cache[key] = value
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _search(self, sentence, embedding, k):
+        """Run one vector search, caching the result and feeding the circuit breaker"""
+        if not self.breaker.allow():
+            return None
+        pipeline = [
+            {
+                "$vectorSearch": {
+                    "queryVector": embedding,
+                    "path": "embedding",
+                    "numCandidates": 100,
+                    "limit": k,
+                    "index": "vector_index"
+                }
+            },
+            {"$project": EXAMPLE_PROJECTION},
+        ]
+        start = time.monotonic()
+        try:
+            results = self.collection.aggregate(pipeline, maxTimeMS=int(self.timeout * 1000))
+            ans = [{i["english_text"]: i["telugu_text"]} for i in results]
+        except Exception as e:
+            self.breaker.record_failure()
+            logger.warning("Error getting examples: %s", e)
+            return None
+
+        # Late answers are still cached, but a slow cluster counts as failing
+        self._cache_put((sentence, k), ans)
+        if time.monotonic() - start > self.timeout:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return ans
+
+    def get_examples_batch(self, sentences, k=None):
+        """Get similar examples for many sentences at once"""
+        k = k or self.k
+        queries = [normalize_query(sentence) for sentence in sentences]
+        results = [self._cache_get((query, k)) for query in queries]
+        missing = list(dict.fromkeys(q for q, r in zip(queries, results) if r is None))
+
+        if missing and self.collection is not None and self.breaker.state != "open":
+            try:
+                # One encoder pass for the whole batch
+                embeddings = self.model.encode(missing)
+            except Exception as e:
+                logger.warning("Error encoding examples: %s", e)
+                embeddings = []
+
+            futures = [
+                self.executor.submit(self._search, sentence, list(map(float, embedding)), k)
+                for sentence, embedding in zip(missing, embeddings)
+            ]
+            # A slow cluster must not hold up translation beyond one timeout per round of workers
+            deadline = self.timeout * math.ceil(len(futures) / self.max_workers)
+            _, not_done = wait(futures, timeout=deadline)
+            for future in not_done:
+                future.cancel()
+
+            results = [r if r is not None else self._cache_get((q, k)) for q, r in zip(queries, results)]
+
+        return [r if r is not None else [] for r in results]
+
+    def get_examples(self, english, k=None):
+        """Get similar examples for one sentence"""
+        return self.get_examples_batch([english], k)[0]
+
+    def prefetch(self, sentences, k=None, wait=False):
+        """
+        Warm the cache so the agent's tool calls are served locally.
+
+        Runs in the background by default so translation does not wait on it.
+        """
+        if self.collection is None or not sentences:
+            return
+        if wait:
+            self.get_examples_batch(sentences, k)
+        else:
+            threading.Thread(
+                target=self.get_examples_batch, args=(list(sentences), k), name="examples-prefetch", daemon=True
+            ).start()
+
+
+class InMemoryCollection:
+    """Stand-in for the examples collection, for local runs without Atlas"""
+
+    def __init__(self, documents=None):
+        self.documents = list(documents or [])
+
+    @classmethod
+    def from_pairs(cls, pairs, model):
+        """Build from (English, Telugu) pairs, embedding with the given model"""
+        pairs = list(pairs)
+        embeddings = model.encode([english for english, _ in pairs]) if pairs else []
+        return cls([
+            {"english_text": english, "telugu_text": telugu, "embedding": list(map(float, embedding))}
+            for (english, telugu), embedding in zip(pairs, embeddings)
+        ])
+
+    def insert_many(self, documents):
+        self.documents.extend(documents)
+
+    @staticmethod
+    def _cosine(a, b):
+        dot = sum(x * y for x, y in zip(a, b))
+        norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+        return dot / norm if norm else 0.0
+
+    def aggregate(self, pipeline, **kwargs):
+        docs = self.documents
+        for stage in pipeline:
+            if "$vectorSearch" in stage:
+                spec = stage["$vectorSearch"]
+                scored = sorted(
+                    docs,
+                    key=lambda d: self._cosine(spec["queryVector"], d[spec["path"]]),
+                    reverse=True,
+                )
+                docs = scored[:spec["limit"]]
+            elif "$project" in stage:
+                fields = [f for f, keep in stage["$project"].items() if keep and f != "_id"]
+                docs = [{f: d[f] for f in fields if f in d} for d in docs]
+            else:
+                raise ValueError(f"Unsupported stage: {list(stage)}")
+        return iter(docs)
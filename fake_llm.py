@@ -0,0 +1,60 @@
+"""
+Simulated chat model for running the translator without Gemini
+"""
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import PrivateAttr
+import random
+import time
+
+
+class SimulatedChatModel(BaseChatModel):
+    """
+    Echoes the English input back as a fake translation after a simulated delay.
+
+    Reports approximate usage metadata so budgets and accounting behave as
+    they would against the real model.
+    """
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    seed: int = None
+
+    _rng: random.Random = PrivateAttr(default=None)
+
+    @property
+    def _llm_type(self):
+        return "simulated"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        # One generator per model, so a seed gives a repeatable sequence rather than the same draw
+        if self._rng is None:
+            self._rng = random.Random(self.seed)
+        rng = self._rng
+        delay = self.latency + rng.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+        if self.error_rate and rng.random() < self.error_rate:
+            raise Exception("Simulated LLM failure")
+
+        prompt = "\n".join(str(message.content) for message in messages)
+        english = str(messages[-1].content)
+        if english.startswith("English:"):
+            english = english[len("English:"):].strip()
+        content = f"[te] {english}"
+
+        # Roughly four characters per token
+        input_tokens = max(len(prompt) // 4, 1)
+        output_tokens = max(len(content) // 4, 1)
+        message = AIMessage(
+            content=content,
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            },
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
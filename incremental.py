@@ -0,0 +1,74 @@
+"""
+Alignment of a revised document against a previous translation run
+"""
+
+from difflib import SequenceMatcher
+import hashlib
+import json
+import re
+
+ERROR_PREFIX = "[Translation Error:"
+
+
+def normalize_chunk(chunk):
+    """Collapse whitespace so layout-only edits do not count as changes"""
+    return re.sub(r'\s+', ' ', chunk).strip()
+
+
+def hash_chunk(chunk):
+    """Stable hash of a chunk's normalized text"""
+    return hashlib.sha256(normalize_chunk(chunk).encode("utf-8")).hexdigest()
+
+
+def load_pairs(source):
+    """Load source/translation pairs from a JSON file, path, string or bytes"""
+    if hasattr(source, "read"):
+        data = source.read()
+    elif isinstance(source, bytes):
+        data = source
+    elif isinstance(source, str) and source.lstrip().startswith("["):
+        data = source
+    else:
+        with open(source, "r", encoding="utf-8") as f:
+            data = f.read()
+    if isinstance(data, bytes):
+        data = data.decode("utf-8")
+    return [(item["english"], item["telugu"]) for item in json.loads(data)]
+
+
+def dump_pairs(pairs):
+    """Serialize source/translation pairs to JSON"""
+    return json.dumps(
+        [{"english": english, "telugu": telugu} for english, telugu in pairs],
+        ensure_ascii=False,
+        indent=2,
+    )
+
+
+def plan_incremental(chunks, previous_pairs):
+    """
+    Align new chunks against a previous run's pairs.
+
+    Returns a list with one entry per new chunk: the reusable translation,
+    or None if the chunk has to be sent to the LLM.
+    """
+    # Failed chunks from the previous run are never worth reusing
+    previous = [(hash_chunk(src), tgt) for src, tgt in previous_pairs if not tgt.startswith(ERROR_PREFIX)]
+    old_hashes = [h for h, _ in previous]
+    new_hashes = [hash_chunk(chunk) for chunk in chunks]
+
+    # Any exact match, used for chunks that moved rather than changed
+    by_hash = {}
+    for h, tgt in previous:
+        by_hash.setdefault(h, tgt)
+
+    plan = [None] * len(chunks)
+    matcher = SequenceMatcher(None, old_hashes, new_hashes, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            for offset in range(j2 - j1):
+                plan[j1 + offset] = previous[i1 + offset][1]
+        elif tag in ("replace", "insert"):
+            for j in range(j1, j2):
+                plan[j] = by_hash.get(new_hashes[j])
+    return plan
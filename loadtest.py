@@ -0,0 +1,429 @@
+"""
+Load test and capacity report for PDFTranslator
+
+Drives translate_chunks with a mix of document sizes at several concurrency
+levels, against a simulated-latency LLM and an in-memory example store, and
+reports latency percentiles, throughput, error rates and RSS growth. Chunk
+latency is split into the wait in the LLM scheduler queue and service time.
+
+With --sessions every client gets its own PDFTranslator, as every Streamlit
+session does in app.py, and the report shows the RSS each session adds.
+
+Example:
+    python loadtest.py --sizes 2:0.6,20:0.3,200:0.1 --concurrency 1,4,16 --docs 40 --output report.md
+    python loadtest.py --sessions --encoder sized --concurrency 1,2,4,8 --docs 16
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import hashlib
+import gc
+import random
+import resource
+import threading
+import time
+import json
+import math
+import os
+
+SENTENCE_TEMPLATES = [
+    "The appellant filed an appeal under Section {n}-A of the Income Tax Act on {d}.",
+    "The Tribunal held that the assessee was entitled to a deduction of Rs. {amt}.",
+    "Learned counsel for the respondent submitted that the order dated {d} was without jurisdiction.",
+    "In I.T.T.A. No. {n} of {y}, the Revenue questioned the finding recorded by the Tribunal.",
+    "The search conducted under Section {n} resulted in the seizure of documents.",
+    "We are of the view that the question of law is answered in favour of the assessee.",
+    "The writ petition is accordingly dismissed, and there shall be no order as to costs.",
+    "The Assessing Officer computed the undisclosed income at Rs. {amt} for the block period.",
+]
+
+# Resident size of intfloat/e5-small: about 33M float32 parameters
+E5_SMALL_MB = 128
+
+
+class HashingEncoder:
+    """Cheap deterministic stand-in for the sentence transformer"""
+
+    def __init__(self, dimensions=64):
+        self.dimensions = dimensions
+
+    def encode(self, sentences):
+        vectors = []
+        for sentence in sentences:
+            vector = [0.0] * self.dimensions
+            for word in sentence.lower().split():
+                digest = hashlib.md5(word.encode("utf-8")).digest()
+                vector[digest[0] % self.dimensions] += 1.0
+            vectors.append(vector)
+        return vectors
+
+
+class SizedEncoder(HashingEncoder):
+    """HashingEncoder that also holds as much memory as the real embedding model"""
+
+    def __init__(self, megabytes, dimensions=64):
+        super().__init__(dimensions)
+        # Written rather than just allocated, so the pages count towards RSS
+        self.weights = bytearray(b"\x01") * (megabytes * 2**20)
+
+
+def make_sentence(rng):
+    return rng.choice(SENTENCE_TEMPLATES).format(
+        n=rng.randint(1, 400),
+        d=f"{rng.randint(1, 28):02d}.{rng.randint(1, 12):02d}.{rng.randint(1990, 2024)}",
+        y=rng.randint(1990, 2024),
+        amt=f"{rng.randint(1, 999):,},{rng.randint(0, 999):03d}",
+    )
+
+
+def make_document(rng, sentences):
+    return " ".join(make_sentence(rng) for _ in range(sentences))
+
+
+def parse_mix(spec):
+    """Parse '2:0.6,20:0.3,200:0.1' into [(sentences, weight), ...]"""
+    mix = []
+    for item in spec.split(","):
+        size, _, weight = item.partition(":")
+        mix.append((int(size), float(weight or 1)))
+    return mix
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile; None for no data"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def current_rss_mb():
+    """Resident set size of this process in MB"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 2**20
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        # Peak rather than current, but better than nothing (KB on Linux, bytes on macOS)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class RSSSampler:
+    """Samples RSS in the background to catch the peak during a run"""
+
+    def __init__(self, interval=0.2):
+        self.interval = interval
+        self.peak = current_rss_mb()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, current_rss_mb())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, current_rss_mb())
+
+
+def make_encoder(args):
+    """Embedding model for one translator"""
+    if args.encoder == "real":
+        from sentence_transformers import SentenceTransformer
+        from translator import EMBEDDING_MODEL
+        return SentenceTransformer(EMBEDDING_MODEL)
+    if args.encoder == "sized":
+        return SizedEncoder(args.encoder_mb)
+    return HashingEncoder()
+
+
+def build_collection(args, encoder):
+    """In-memory example collection shared by every session, standing in for MongoDB"""
+    from example_store import InMemoryCollection
+
+    if not args.examples:
+        return None
+    rng = random.Random(args.seed + 1)
+    pairs = [(make_sentence(rng), f"[te] {i}") for i in range(args.examples)]
+    return InMemoryCollection.from_pairs(pairs, encoder)
+
+
+def build_translator(args, encoder, collection, index=0):
+    """Translator wired to the simulated LLM and a local example store"""
+    from translator import PDFTranslator
+    from fake_llm import SimulatedChatModel
+    from example_store import ExampleStore
+
+    llm = SimulatedChatModel(latency=args.llm_latency, jitter=args.llm_jitter,
+                             error_rate=args.error_rate, seed=args.seed + index)
+    store = ExampleStore(collection, encoder) if collection is not None else ExampleStore(None, None)
+    return PDFTranslator(llm=llm, example_store=store)
+
+
+class Sessions:
+    """
+    Translators for the simulated clients, and the RSS each one added.
+
+    By default one translator serves every client. With --sessions each
+    client gets its own, with its own spaCy model, encoder and example
+    store thread pool, as app.py builds one per Streamlit session.
+    """
+
+    def __init__(self, args):
+        # Import up front so the first session is not charged for loading modules
+        import translator
+
+        self.args = args
+        self.encoder = make_encoder(args)
+        self.collection = build_collection(args, self.encoder)
+        self.translators = []
+        self.memory = []
+
+    def for_clients(self, clients):
+        """Translators to use for this many concurrent clients"""
+        self.grow(clients if self.args.sessions else 1)
+        return self.translators[:clients]
+
+    def grow(self, count):
+        while len(self.translators) < count:
+            gc.collect()
+            before = current_rss_mb()
+            encoder = make_encoder(self.args) if self.args.sessions else self.encoder
+            self.translators.append(build_translator(self.args, encoder, self.collection, len(self.translators)))
+            gc.collect()
+            after = current_rss_mb()
+            self.memory.append({"sessions": len(self.translators), "rss_mb": after, "added_mb": after - before})
+
+
+def run_level(translators, documents, concurrency):
+    """Translate documents with the given number of concurrent clients"""
+    from incremental import ERROR_PREFIX
+
+    queue_waits = []
+    service_times = []
+    chunk_latencies = []
+    lock = threading.Lock()
+    # Every translator shares the process-wide scheduler
+    scheduler = translators[0].scheduler
+    submit = scheduler.submit
+
+    def timed_submit(job, fn, *args, **kwargs):
+        submitted = time.perf_counter()
+
+        def timed(*call_args, **call_kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*call_args, **call_kwargs)
+            finally:
+                finished = time.perf_counter()
+                with lock:
+                    queue_waits.append(started - submitted)
+                    service_times.append(finished - started)
+                    chunk_latencies.append(finished - submitted)
+
+        return submit(job, timed, *args, **kwargs)
+
+    def run_document(index, text):
+        client = index % concurrency
+        translator = translators[client % len(translators)]
+        start = time.perf_counter()
+        first_chunk = []
+
+        def on_chunk(i, english, telugu):
+            if not first_chunk:
+                first_chunk.append(time.perf_counter() - start)
+
+        try:
+            pairs = translator.translate_chunks(text, user=f"client-{client}", chunk_callback=on_chunk)
+        except Exception as e:
+            return {"ok": False, "error": str(e), "seconds": time.perf_counter() - start}
+        return {
+            "ok": True,
+            "seconds": time.perf_counter() - start,
+            "first_chunk": first_chunk[0] if first_chunk else None,
+            "chunks": len(pairs),
+            "chunk_errors": sum(1 for _, telugu in pairs if telugu.startswith(ERROR_PREFIX)),
+        }
+
+    scheduler.submit = timed_submit
+    rss_start = current_rss_mb()
+    try:
+        with RSSSampler() as sampler:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                results = list(pool.map(run_document, range(len(documents)), documents))
+            elapsed = time.perf_counter() - started
+    finally:
+        del scheduler.submit
+
+    ok = [r for r in results if r["ok"]]
+    chunks = sum(r["chunks"] for r in ok)
+    chunk_errors = sum(r["chunk_errors"] for r in ok)
+    end_to_end = [r["seconds"] for r in ok]
+    first_chunk = [r["first_chunk"] for r in ok if r["first_chunk"] is not None]
+    return {
+        "concurrency": concurrency,
+        "sessions": len(translators),
+        "documents": len(documents),
+        "failed_documents": len(results) - len(ok),
+        "chunks": chunks,
+        "chunk_error_rate": chunk_errors / chunks if chunks else 0.0,
+        "wall_seconds": elapsed,
+        "documents_per_second": len(ok) / elapsed if elapsed else 0.0,
+        "chunks_per_second": chunks / elapsed if elapsed else 0.0,
+        "end_to_end": {f"p{p}": percentile(end_to_end, p) for p in (50, 95, 99)},
+        "chunk": {f"p{p}": percentile(chunk_latencies, p) for p in (50, 95, 99)},
+        "queue_wait": {f"p{p}": percentile(queue_waits, p) for p in (50, 95, 99)},
+        "service": {f"p{p}": percentile(service_times, p) for p in (50, 95, 99)},
+        "first_chunk": {f"p{p}": percentile(first_chunk, p) for p in (50, 95, 99)},
+        "rss_start_mb": rss_start,
+        "rss_end_mb": current_rss_mb(),
+        "rss_peak_mb": sampler.peak,
+    }
+
+
+def _fmt(seconds):
+    return "-" if seconds is None else f"{seconds:.2f}"
+
+
+def format_report(args, levels, memory=None):
+    """Markdown capacity report; memory is the per-session RSS from Sessions"""
+    if args.sessions:
+        sessions = f"one translator per client, `{args.encoder}` encoder"
+    else:
+        sessions = f"one translator shared by all clients, `{args.encoder}` encoder"
+    lines = [
+        "# Translation load test",
+        "",
+        f"- Document mix (sentences:weight): `{args.sizes}`",
+        f"- Documents per level: {args.docs}",
+        f"- Simulated LLM latency: {args.llm_latency}s ± {args.llm_jitter}s, error rate {args.error_rate:.1%}",
+        f"- Global LLM concurrency cap: {args.llm_concurrency}",
+        f"- Example store: {args.examples} in-memory pairs",
+        f"- Sessions: {sessions}",
+        "",
+        "## Throughput and errors",
+        "",
+        "| Clients | Docs | Chunks | Docs/s | Chunks/s | Failed docs | Chunk errors |",
+        "|---|---|---|---|---|---|---|",
+    ]
+    for level in levels:
+        lines.append(
+            f"| {level['concurrency']} | {level['documents']} | {level['chunks']} "
+            f"| {level['documents_per_second']:.2f} | {level['chunks_per_second']:.2f} "
+            f"| {level['failed_documents']} | {level['chunk_error_rate']:.1%} |"
+        )
+    lines += [
+        "",
+        "## Document latency (seconds)",
+        "",
+        "| Clients | Doc p50 | Doc p95 | Doc p99 | First chunk p50 | First chunk p95 |",
+        "|---|---|---|---|---|---|",
+    ]
+    for level in levels:
+        e2e, first = level["end_to_end"], level["first_chunk"]
+        lines.append(
+            f"| {level['concurrency']} | {_fmt(e2e['p50'])} | {_fmt(e2e['p95'])} | {_fmt(e2e['p99'])} "
+            f"| {_fmt(first['p50'])} | {_fmt(first['p95'])} |"
+        )
+    lines += [
+        "",
+        "## Chunk latency (seconds)",
+        "",
+        "Submit to result, split into the wait in the LLM scheduler queue and service time.",
+        "",
+        "| Clients | Total p50 | Total p95 | Total p99 | Queue p50 | Queue p95 | Queue p99 | Service p50 | Service p95 | Service p99 |",
+        "|---|---|---|---|---|---|---|---|---|---|",
+    ]
+    for level in levels:
+        chunk, queue, service = level["chunk"], level["queue_wait"], level["service"]
+        lines.append(
+            f"| {level['concurrency']} | {_fmt(chunk['p50'])} | {_fmt(chunk['p95'])} | {_fmt(chunk['p99'])} "
+            f"| {_fmt(queue['p50'])} | {_fmt(queue['p95'])} | {_fmt(queue['p99'])} "
+            f"| {_fmt(service['p50'])} | {_fmt(service['p95'])} | {_fmt(service['p99'])} |"
+        )
+    lines += [
+        "",
+        "## Memory (MB)",
+        "",
+        "| Clients | RSS start | RSS end | RSS peak | Growth |",
+        "|---|---|---|---|---|",
+    ]
+    for level in levels:
+        lines.append(
+            f"| {level['concurrency']} | {level['rss_start_mb']:.0f} | {level['rss_end_mb']:.0f} "
+            f"| {level['rss_peak_mb']:.0f} | {level['rss_peak_mb'] - level['rss_start_mb']:+.0f} |"
+        )
+    if args.sessions and memory:
+        lines += [
+            "",
+            "## Memory per session (MB)",
+            "",
+            "| Sessions | RSS after building | Added by this session |",
+            "|---|---|---|",
+        ]
+        for entry in memory:
+            lines.append(f"| {entry['sessions']} | {entry['rss_mb']:.0f} | {entry['added_mb']:+.0f} |")
+        average = sum(entry["added_mb"] for entry in memory) / len(memory)
+        lines += ["", f"Average RSS per added session: {average:.0f} MB"]
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test PDFTranslator against a simulated LLM")
+    parser.add_argument("--sizes", default="2:0.6,20:0.3,200:0.1",
+                        help="document sizes in sentences with relative weights")
+    parser.add_argument("--concurrency", default="1,4,16", help="comma-separated client counts")
+    parser.add_argument("--docs", type=int, default=20, help="documents per concurrency level")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="simulated seconds per LLM call")
+    parser.add_argument("--llm-jitter", type=float, default=0.1)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of LLM calls that fail")
+    parser.add_argument("--llm-concurrency", type=int, default=int(os.getenv("LLM_MAX_CONCURRENCY", 4)),
+                        help="global LLM concurrency cap")
+    parser.add_argument("--examples", type=int, default=1000, help="pairs in the in-memory example store")
+    parser.add_argument("--sessions", action="store_true",
+                        help="give every client its own translator, as app.py does per Streamlit session")
+    parser.add_argument("--encoder", choices=["hash", "sized", "real"], default="hash",
+                        help="hashing stand-in, the stand-in padded to --encoder-mb, or the real e5 model")
+    parser.add_argument("--encoder-mb", type=int, default=E5_SMALL_MB,
+                        help="memory held by the sized encoder")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the markdown report here")
+    parser.add_argument("--json", help="write raw results as JSON here")
+    args = parser.parse_args()
+
+    # The scheduler reads its cap when first created by PDFTranslator
+    os.environ["LLM_MAX_CONCURRENCY"] = str(args.llm_concurrency)
+    sessions = Sessions(args)
+    rng = random.Random(args.seed)
+    mix = parse_mix(args.sizes)
+    sizes, weights = zip(*mix)
+
+    levels = []
+    for concurrency in [int(c) for c in args.concurrency.split(",")]:
+        documents = [make_document(rng, size) for size in rng.choices(sizes, weights, k=args.docs)]
+        print(f"Running {len(documents)} documents with {concurrency} concurrent clients...")
+        levels.append(run_level(sessions.for_clients(concurrency), documents, concurrency))
+
+    report = format_report(args, levels, sessions.memory)
+    print(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "levels": levels, "sessions": sessions.memory}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
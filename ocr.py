@@ -0,0 +1,153 @@
+"""
+OCR fallback for PDF pages without a text layer
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+import threading
+import hashlib
+import logging
+import json
+import os
+import fitz
+
+logger = logging.getLogger(__name__)
+
+# Pages with less extractable text than this are treated as scanned
+OCR_MIN_CHARS = int(os.getenv("OCR_MIN_CHARS", 20))
+OCR_DPI = int(os.getenv("OCR_DPI", 300))
+OCR_LANGUAGE = os.getenv("OCR_LANGUAGE", "eng")
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", os.cpu_count() or 1))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the process pool shared by all OCR runs"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawn rather than fork: the parent holds threads, locks and models
+            _pool = ProcessPoolExecutor(max_workers=OCR_WORKERS,
+                                        mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def _reset_pool(pool):
+    """Drop a broken pool so the next OCR run starts a fresh one"""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def needs_ocr(text):
+    """Whether a page's extracted text is too thin to be a real text layer"""
+    return len(text.strip()) < OCR_MIN_CHARS
+
+
+def page_hash(doc, page):
+    """Hash of what a page draws: its content streams and embedded images"""
+    h = hashlib.sha256()
+    h.update(repr(tuple(page.rect)).encode())
+    h.update(page.read_contents())
+    for image in page.get_images(full=True):
+        h.update(doc.xref_stream_raw(image[0]) or b"")
+    return h.hexdigest()
+
+
+def _ocr_pages(pdf_bytes, page_numbers, dpi, language):
+    """Rasterize and OCR a group of pages; runs in a worker process"""
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    try:
+        results = {}
+        for number in page_numbers:
+            page = doc[number]
+            textpage = page.get_textpage_ocr(dpi=dpi, full=True, language=language)
+            results[number] = page.get_text(textpage=textpage)
+        return results
+    finally:
+        doc.close()
+
+
+class OCRCache:
+    """OCR results keyed by page hash, in memory and optionally on disk"""
+
+    def __init__(self, directory=None):
+        self.directory = directory if directory is not None else os.getenv("OCR_CACHE_DIR")
+        self._memory = {}
+        self._lock = threading.Lock()
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        with self._lock:
+            if key in self._memory:
+                return self._memory[key]
+        if self.directory and os.path.exists(self._path(key)):
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                text = json.load(f)["text"]
+            with self._lock:
+                self._memory[key] = text
+            return text
+        return None
+
+    def put(self, key, text):
+        with self._lock:
+            self._memory[key] = text
+        if self.directory:
+            with open(self._path(key), "w", encoding="utf-8") as f:
+                json.dump({"text": text}, f, ensure_ascii=False)
+
+
+def ocr_pages(pdf_bytes, doc, page_numbers, cache=None, dpi=OCR_DPI, language=OCR_LANGUAGE):
+    """
+    OCR the given pages of doc in the process pool, using the cache where possible.
+
+    Pages whose OCR fails (e.g. Tesseract is not installed) are logged and left
+    out of the result, so callers keep whatever the text layer had.
+    """
+    cache = cache or OCRCache()
+    results = {}
+    keys = {}
+    todo = []
+    for number in page_numbers:
+        keys[number] = f"{page_hash(doc, doc[number])}-{dpi}-{language}"
+        cached = cache.get(keys[number])
+        if cached is not None:
+            results[number] = cached
+        else:
+            todo.append(number)
+
+    if todo:
+        # One task per worker so the PDF bytes are shipped once per process
+        groups = [group for group in (todo[i::OCR_WORKERS] for i in range(OCR_WORKERS)) if group]
+        pool = get_pool()
+        try:
+            futures = [(group, pool.submit(_ocr_pages, pdf_bytes, group, dpi, language)) for group in groups]
+        except BrokenProcessPool:
+            _reset_pool(pool)
+            pool = get_pool()
+            futures = [(group, pool.submit(_ocr_pages, pdf_bytes, group, dpi, language)) for group in groups]
+
+        for group, future in futures:
+            try:
+                pages = future.result()
+            except BrokenProcessPool as e:
+                _reset_pool(pool)
+                logger.warning("OCR pool broke while reading pages %s: %s", group, e)
+                continue
+            except Exception as e:
+                logger.warning("OCR failed for pages %s, keeping the text layer: %s", group, e)
+                continue
+            for number, text in pages.items():
+                cache.put(keys[number], text)
+                results[number] = text
+
+    return results
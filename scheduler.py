@@ -0,0 +1,206 @@
+"""
+Process-wide scheduler for LLM work shared by all translators
+"""
+
+from concurrent.futures import Future
+from collections import deque
+import itertools
+import threading
+import time
+import uuid
+import os
+
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BATCH = "batch"
+
+# Relative share of LLM capacity per priority
+PRIORITY_WEIGHTS = {PRIORITY_INTERACTIVE: 4.0, PRIORITY_BATCH: 1.0}
+
+# Documents with at most this many chunks get a larger share
+SHORT_JOB_CHUNKS = int(os.getenv("LLM_SHORT_JOB_CHUNKS", 50))
+SHORT_JOB_BOOST = 2.0
+
+
+class Job:
+    """One document's worth of LLM work"""
+
+    def __init__(self, user, priority, total):
+        self.job_id = uuid.uuid4().hex
+        self.user = user
+        self.priority = priority
+        self.total = total
+        self.queue = deque()
+        self.running = 0
+        self.completed = 0
+        self.vtime = 0.0
+        self.created_at = time.time()
+        self.finished_at = None
+        self.closed = False
+        # Token and time accounting, attached by the submitter
+        self.usage = None
+
+    @property
+    def remaining(self):
+        return len(self.queue) + self.running
+
+
+class LLMScheduler:
+    """
+    Fair queue with a global concurrency cap.
+
+    Each job carries a virtual time that advances by 1 / weight for every
+    task dispatched, and workers always take the job with the lowest
+    virtual time. A job's weight is its priority weight (boosted for short
+    documents) divided by the number of active jobs its user has, so users
+    get equal shares, a user's documents split that share, and interactive
+    or short work gets more of it without starving anything else.
+    """
+
+    def __init__(self, max_concurrency=None):
+        self.max_concurrency = max_concurrency or int(os.getenv("LLM_MAX_CONCURRENCY", 4))
+        self.jobs = {}
+        self._vclock = 0.0
+        self._avg_task_seconds = None
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._workers = [
+            threading.Thread(target=self._worker, name=f"llm-scheduler-{i}", daemon=True)
+            for i in range(self.max_concurrency)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def _active_jobs(self):
+        return [job for job in self.jobs.values() if not job.closed]
+
+    def _weight(self, job):
+        weight = PRIORITY_WEIGHTS.get(job.priority, 1.0)
+        if job.total is not None and job.total <= SHORT_JOB_CHUNKS:
+            weight *= SHORT_JOB_BOOST
+        user_jobs = sum(1 for j in self._active_jobs() if j.user == job.user)
+        return weight / max(user_jobs, 1)
+
+    def create_job(self, user="anonymous", priority=PRIORITY_INTERACTIVE, total=None):
+        """Register a document; total is its chunk count if known"""
+        job = Job(user, priority, total)
+        with self._cond:
+            # Start at the current virtual clock so idle time is not banked
+            job.vtime = self._vclock
+            self.jobs[job.job_id] = job
+        return job
+
+    def submit(self, job, fn, *args, **kwargs):
+        """Queue fn(*args, **kwargs) under job and return a Future"""
+        future = Future()
+        with self._cond:
+            if job.closed:
+                raise Exception(f"Job {job.job_id} is closed")
+            job.queue.append((next(self._seq), future, fn, args, kwargs))
+            self._cond.notify()
+        return future
+
+    def close_job(self, job):
+        """Finish a job, cancelling anything still queued"""
+        with self._cond:
+            job.closed = True
+            job.finished_at = time.time()
+            while job.queue:
+                _, future, _, _, _ = job.queue.popleft()
+                # Notify waiters too, or wait() and as_completed() never see it finish
+                if future.cancel():
+                    future.set_running_or_notify_cancel()
+            self.jobs.pop(job.job_id, None)
+
+    def _next_task(self):
+        candidates = [job for job in self._active_jobs() if job.queue]
+        if not candidates:
+            return None, None
+        job = min(candidates, key=lambda j: (j.vtime, j.queue[0][0]))
+        job.vtime += 1.0 / self._weight(job)
+        self._vclock = max(self._vclock, min(j.vtime for j in candidates))
+        job.running += 1
+        return job, job.queue.popleft()
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                job, task = self._next_task()
+                while task is None:
+                    self._cond.wait()
+                    job, task = self._next_task()
+
+            _, future, fn, args, kwargs = task
+            if not future.set_running_or_notify_cancel():
+                with self._cond:
+                    job.running -= 1
+                continue
+
+            start = time.monotonic()
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+            elapsed = time.monotonic() - start
+
+            with self._cond:
+                job.running -= 1
+                job.completed += 1
+                if self._avg_task_seconds is None:
+                    self._avg_task_seconds = elapsed
+                else:
+                    self._avg_task_seconds = 0.8 * self._avg_task_seconds + 0.2 * elapsed
+
+    def _eta(self, job, active):
+        if self._avg_task_seconds is None or not job.remaining:
+            return 0.0 if not job.remaining else None
+        weights = {j.job_id: self._weight(j) for j in active if j.remaining}
+        share = weights.get(job.job_id, 0.0) / (sum(weights.values()) or 1.0)
+        # A job cannot use more workers than it has tasks
+        parallelism = min(self.max_concurrency * share, job.remaining) or 1.0
+        return job.remaining * self._avg_task_seconds / parallelism
+
+    def _job_stats(self, job, active):
+        return {
+            "job_id": job.job_id,
+            "user": job.user,
+            "priority": job.priority,
+            "total": job.total,
+            "queued": len(job.queue),
+            "running": job.running,
+            "completed": job.completed,
+            "eta_seconds": self._eta(job, active),
+            "usage": job.usage.summary() if job.usage else None,
+        }
+
+    def job_stats(self, job_id):
+        """Queue depth, progress and estimated seconds to completion for a job"""
+        with self._cond:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            return self._job_stats(job, self._active_jobs())
+
+    def stats(self):
+        """Global queue depth and per-job stats"""
+        with self._cond:
+            active = self._active_jobs()
+            return {
+                "max_concurrency": self.max_concurrency,
+                "queued": sum(len(job.queue) for job in active),
+                "running": sum(job.running for job in active),
+                "avg_task_seconds": self._avg_task_seconds,
+                "jobs": [self._job_stats(job, active) for job in active],
+            }
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Return the process-wide scheduler"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = LLMScheduler()
+        return _scheduler
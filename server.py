@@ -0,0 +1,207 @@
+"""
+Async HTTP API around PDFTranslator
+
+Run with:  uvicorn server:app
+Set TRANSLATOR_BACKEND=fake to use a simulated LLM and no example store.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, File, Form, HTTPException, UploadFile
+from fastapi.responses import StreamingResponse
+from example_store import ExampleStore
+from fake_llm import SimulatedChatModel
+from incremental import ERROR_PREFIX
+from scheduler import PRIORITY_BATCH, PRIORITY_WEIGHTS
+from translator import PDFTranslator, join_translation
+import asyncio
+import json
+import time
+import io
+import os
+
+# Finished jobs are kept this long for status and result requests
+JOB_TTL_SECONDS = int(os.getenv("API_JOB_TTL_S", 3600))
+
+# Threads that drive jobs; they mostly wait on the shared LLM scheduler
+JOB_THREADS = int(os.getenv("API_JOB_THREADS", 64))
+
+
+def build_translator():
+    """Create the one translator shared by every request"""
+    if os.getenv("TRANSLATOR_BACKEND") == "fake":
+        llm = SimulatedChatModel(latency=float(os.getenv("FAKE_LLM_LATENCY", 0.5)))
+        return PDFTranslator(llm=llm, example_store=ExampleStore(None, None))
+    return PDFTranslator()
+
+
+class TranslationJob:
+    """State of one API job, fed from the worker thread"""
+
+    def __init__(self, job, loop):
+        self.job = job
+        self.job_id = job.job_id
+        self.loop = loop
+        self.status = "queued"
+        self.events = []
+        self.pairs = []
+        self.total = None
+        self.error = None
+        self.usage = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self._changed = asyncio.Event()
+
+    def push(self, event, data):
+        """Record an event; safe to call from any thread"""
+        self.loop.call_soon_threadsafe(self._push, event, data)
+
+    def _push(self, event, data):
+        self.events.append((event, data))
+        self._changed.set()
+
+    async def stream(self):
+        """Yield events as they arrive, ending after done or error"""
+        index = 0
+        while True:
+            while index < len(self.events):
+                event, data = self.events[index]
+                index += 1
+                yield event, data
+                if event in ("done", "error"):
+                    return
+            self._changed.clear()
+            if index < len(self.events):
+                continue
+            await self._changed.wait()
+
+
+def create_app(translator=None):
+    """Build the API; pass a translator to share preloaded models or a fake LLM"""
+
+    @asynccontextmanager
+    async def lifespan(app):
+        if app.state.translator is None:
+            app.state.translator = await asyncio.to_thread(build_translator)
+        yield
+
+    app = FastAPI(title="Legal PDF Translator", lifespan=lifespan)
+    app.state.translator = translator
+    app.state.jobs = {}
+    app.state.executor = ThreadPoolExecutor(max_workers=JOB_THREADS, thread_name_prefix="api-job")
+
+    def prune_jobs():
+        now = time.time()
+        for job_id, record in list(app.state.jobs.items()):
+            if record.finished_at and now - record.finished_at > JOB_TTL_SECONDS:
+                del app.state.jobs[job_id]
+
+    def run_job(record, pdf_bytes, text):
+        translator = app.state.translator
+        try:
+            record.status = "running"
+            if pdf_bytes is not None:
+                text = translator.extract_text_from_pdf(io.BytesIO(pdf_bytes))
+
+            def on_progress(current, total):
+                record.total = total
+
+            def on_chunk(index, english, telugu):
+                record.pairs.append((english, telugu))
+                record.push("chunk", {"index": index, "english": english, "telugu": telugu})
+
+            pairs = translator.translate_chunks(text, progress_callback=on_progress,
+                                                job=record.job, chunk_callback=on_chunk)
+            # Individual failures stay as error markers; a job where every chunk failed is an error
+            if pairs and all(telugu.startswith(ERROR_PREFIX) for _, telugu in pairs):
+                raise Exception(f"Translation failed for all {len(pairs)} chunks")
+            record.status = "done"
+            record.usage = record.job.usage.summary() if record.job.usage else None
+            event = ("done", {"translation": join_translation(record.pairs), "usage": record.usage})
+        except Exception as e:
+            record.status = "failed"
+            record.error = str(e)
+            event = ("error", {"error": record.error})
+        finally:
+            translator.scheduler.close_job(record.job)
+            record.finished_at = time.time()
+        # Only announce the end once the job is closed and can expire
+        record.push(*event)
+
+    def get_record(job_id):
+        # Readers prune too, so finished jobs do not wait for the next submission to expire
+        prune_jobs()
+        record = app.state.jobs.get(job_id)
+        if record is None:
+            raise HTTPException(status_code=404, detail="Unknown job")
+        return record
+
+    @app.post("/jobs")
+    async def create_job(file: UploadFile = File(None), text: str = Form(None),
+                         user: str = Form("anonymous"), priority: str = Form(PRIORITY_BATCH)):
+        """Accept a PDF upload or plain text and start translating it"""
+        if (file is None) == (text is None):
+            raise HTTPException(status_code=400, detail="Send exactly one of 'file' or 'text'")
+        if priority not in PRIORITY_WEIGHTS:
+            raise HTTPException(status_code=400, detail=f"Unknown priority '{priority}'")
+
+        pdf_bytes = await file.read() if file is not None else None
+        prune_jobs()
+
+        translator = app.state.translator
+        job = translator.scheduler.create_job(user=user, priority=priority)
+        record = TranslationJob(job, asyncio.get_running_loop())
+        app.state.jobs[record.job_id] = record
+        asyncio.get_running_loop().run_in_executor(app.state.executor, run_job, record, pdf_bytes, text)
+        return {"job_id": record.job_id}
+
+    @app.get("/jobs/{job_id}")
+    async def job_status(job_id: str):
+        """Status, progress, queue position and usage of a job"""
+        record = get_record(job_id)
+        stats = app.state.translator.scheduler.job_stats(job_id) or {}
+        return {
+            "job_id": job_id,
+            "status": record.status,
+            "total_chunks": record.total,
+            "translated_chunks": len(record.pairs),
+            "queued": stats.get("queued", 0),
+            "eta_seconds": stats.get("eta_seconds"),
+            "usage": stats.get("usage") or record.usage,
+            "error": record.error,
+        }
+
+    @app.get("/jobs/{job_id}/events")
+    async def job_events(job_id: str):
+        """Server-sent events: one 'chunk' per translated chunk, then 'done' or 'error'"""
+        record = get_record(job_id)
+
+        async def event_source():
+            async for event, data in record.stream():
+                yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+        return StreamingResponse(event_source(), media_type="text/event-stream")
+
+    @app.get("/jobs/{job_id}/result")
+    async def job_result(job_id: str):
+        """Final translation and pairs of a finished job"""
+        record = get_record(job_id)
+        if record.status != "done":
+            raise HTTPException(status_code=409, detail=f"Job is {record.status}")
+        return {
+            "job_id": job_id,
+            "translation": join_translation(record.pairs),
+            "pairs": [{"english": english, "telugu": telugu} for english, telugu in record.pairs],
+            "usage": record.usage,
+        }
+
+    @app.get("/health")
+    async def health():
+        """Scheduler load across all jobs"""
+        prune_jobs()
+        return app.state.translator.scheduler.stats()
+
+    return app
+
+
+app = create_app()
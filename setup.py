@@ -26,7 +26,8 @@ def check_env_file():
         with open(".env", "w") as f:
             f.write("# Add your environment variables here\n")
             f.write("# GOOGLE_API_KEY=your_google_api_key_here\n")
-        print("Please add your Google API key to the .env file")
+            f.write("# MONGODB_URI=your_mongodb_connection_string_here\n")
+        print("Please add your Google API key and MongoDB URI to the .env file")
 
 def main():
     """Main setup function"""
@@ -0,0 +1,37 @@
+import fitz
+import pytest
+
+from example_store import ExampleStore
+from fake_llm import SimulatedChatModel
+from translator import PDFTranslator
+
+
+@pytest.fixture
+def make_translator():
+    """PDFTranslator on the simulated LLM with no example store"""
+
+    def make(llm=None, fallback_llm=None):
+        return PDFTranslator(
+            llm=llm or SimulatedChatModel(),
+            fallback_llm=fallback_llm,
+            example_store=ExampleStore(None, None),
+        )
+
+    return make
+
+
+@pytest.fixture
+def make_pdf():
+    """PDF bytes with one page per text; None gives a blank page"""
+
+    def make(*page_texts):
+        doc = fitz.open()
+        for text in page_texts:
+            page = doc.new_page()
+            if text:
+                page.insert_text((72, 72), text)
+        data = doc.tobytes()
+        doc.close()
+        return data
+
+    return make
@@ -0,0 +1,97 @@
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+
+from budget import Budget, BudgetExceeded, Usage, UsageCallbackHandler, UsageTracker
+
+
+def llm_result(input_tokens, output_tokens):
+    message = AIMessage(content="x", usage_metadata={
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "total_tokens": input_tokens + output_tokens,
+    })
+    return LLMResult(generations=[[ChatGeneration(message=message)]])
+
+
+def test_handler_aggregates_into_chunk_and_document():
+    tracker = UsageTracker(Budget())
+    first, second = UsageCallbackHandler(tracker), UsageCallbackHandler(tracker)
+    first.on_llm_end(llm_result(100, 20))
+    first.on_tool_start({}, "input")
+    first.on_llm_end(llm_result(50, 5))
+    second.on_llm_end(llm_result(10, 1))
+
+    assert first.usage.as_dict() == {
+        "input_tokens": 150, "output_tokens": 25, "total_tokens": 175, "llm_calls": 2, "tool_calls": 1,
+    }
+    tracker.record_chunk("a", first.usage)
+    tracker.record_chunk("b", second.usage, "chunk token budget exceeded")
+    summary = tracker.summary()
+    assert summary["total_tokens"] == 186
+    assert summary["llm_calls"] == 3
+    assert summary["tool_calls"] == 1
+    assert summary["chunks"] == 2
+    assert summary["fallbacks"] == 1
+    assert tracker.chunks[1]["fallback"] == "chunk token budget exceeded"
+
+
+def test_chunk_cap_is_checked_before_the_next_step_not_after_the_answer():
+    handler = UsageCallbackHandler(UsageTracker(Budget(max_tokens_per_chunk=100)))
+    handler.on_chat_model_start({}, [[]])
+    # The call that produced the answer may overrun without raising
+    handler.on_llm_end(llm_result(90, 20))
+    with pytest.raises(BudgetExceeded, match="chunk token"):
+        handler.on_chat_model_start({}, [[]])
+    with pytest.raises(BudgetExceeded, match="chunk token"):
+        handler.on_tool_start({}, "input")
+
+
+def test_document_token_budget():
+    tracker = UsageTracker(Budget(max_tokens_per_document=50))
+    UsageCallbackHandler(tracker).on_llm_end(llm_result(40, 20))
+    assert tracker.exceeded() == "document token budget exceeded"
+    with pytest.raises(BudgetExceeded, match="document token"):
+        UsageCallbackHandler(tracker).on_llm_start({}, ["prompt"])
+
+
+def test_document_time_budget():
+    tracker = UsageTracker(Budget(max_seconds_per_document=0.001))
+    tracker.started -= 1
+    assert tracker.exceeded() == "document time budget exceeded"
+
+
+def test_enforce_off_never_raises():
+    handler = UsageCallbackHandler(UsageTracker(Budget(max_tokens_per_chunk=1)), enforce=False)
+    handler.on_llm_end(llm_result(10, 10))
+    handler.on_chat_model_start({}, [[]])
+    assert handler.usage.total_tokens == 20
+
+
+def test_usage_add():
+    total = Usage()
+    part = Usage()
+    part.input_tokens, part.output_tokens, part.total_tokens, part.llm_calls = 3, 2, 5, 1
+    total.add(part)
+    total.add(part)
+    assert total.as_dict()["total_tokens"] == 10
+    assert total.as_dict()["llm_calls"] == 2
+
+
+def test_translator_keeps_answer_that_overruns_chunk_cap(make_translator):
+    translator = make_translator()
+    tracker = UsageTracker(Budget(max_tokens_per_chunk=1))
+    translation = translator.translate_chunk("The appeal is dismissed with costs.", tracker)
+    assert translation == "[te] The appeal is dismissed with costs."
+    assert tracker.fallbacks == 0
+    assert tracker.summary()["llm_calls"] == 1
+
+
+def test_translator_uses_fallback_once_document_is_over_budget(make_translator):
+    translator = make_translator()
+    tracker = UsageTracker(Budget(max_tokens_per_document=1))
+    translator.translate_chunk("The appeal is dismissed with costs.", tracker)
+    translation = translator.translate_chunk("The writ petition is allowed.", tracker)
+    assert translation == "[te] The writ petition is allowed."
+    assert tracker.fallbacks == 1
+    assert tracker.chunks[1]["fallback"] == "document token budget exceeded"
@@ -0,0 +1,209 @@
+import pytest
+import spacy
+
+from budget import BudgetExceeded, UsageTracker
+from entities import PLACEHOLDER_RE, EntityProtector
+from fake_llm import SimulatedChatModel
+
+GLOSSARY = {
+    "Income Tax Act": "ఆదాయపు పన్ను చట్టం",
+    "Assessing Officer": "అసెస్సింగ్ అధికారి",
+    "Section 10 exemption": "సెక్షన్ 10 మినహాయింపు",
+    "Tribunal": "ట్రిబ్యునల్",
+    "High Court": "nan",
+}
+
+
+@pytest.fixture(scope="module")
+def protector():
+    return EntityProtector(spacy.blank("en"), GLOSSARY)
+
+
+@pytest.mark.parametrize("chunk, values", [
+    # Section references: each number is protected, the keyword and connectives are translated
+    ("The appeal under Section 260-A is admitted.", ["260-A"]),
+    ("Search under Sections 132(4A) and 158BC was valid.", ["132(4A)", "158BC"]),
+    ("Rules 3 to 5 apply.", ["3", "5"]),
+    ("Rule 5 applies.", ["5"]),
+    # Case numbers need a dotted case type; only the numbers are protected
+    ("I.T.T.A.Nos.10, 12 and 19 of 1999 are heard together.", ["10", "12", "19", "1999"]),
+    ("In W.P. No. 1234 of 2010 the order was set aside.", ["1234", "2010"]),
+    ("Crl.A. No. 5/2001 is allowed.", ["5", "2001"]),
+    ("THE HIGH COURT No 5 is closed.", []),
+    # Honorifics are not case types
+    ("This is Mr. No. 1 fan.", []),
+    ("Dr. No. 2 and Sri. No. 3 were absent.", []),
+    ("Smt. W.P. No. 7 of 2003 is heard.", ["7", "2003"]),
+    # Dates
+    ("The order dated 31.07.2014 was served on 1/4/99.", ["31.07.2014", "1/4/99"]),
+    # Amounts, with and without grouping commas; the currency word is translated
+    ("A sum of Rs. 50000 was seized.", ["50000"]),
+    ("A sum of Rs. 5,00,000/- was seized.", ["5,00,000/-"]),
+    ("Only Rs.1,250.50 remained.", ["1,250.50"]),
+    ("It was INR 1,000, which was refunded.", ["1,000"]),
+    ("₹ 75 was paid.", ["75"]),
+    ("It was Rs. 500crores.", []),
+    # Glossary terms of two or more words are restored in Telugu, case-insensitively
+    ("The Income Tax Act applies.", ["ఆదాయపు పన్ను చట్టం"]),
+    ("the income tax act applies.", ["ఆదాయపు పన్ను చట్టం"]),
+    ("The Assessing Officer erred.", ["అసెస్సింగ్ అధికారి"]),
+    ("The Tribunal erred.", []),
+    ("The High Court held so.", []),
+])
+def test_detect(protector, chunk, values):
+    spans = protector.detect([chunk])[0]
+    assert [value for _, _, value in spans] == values
+
+
+@pytest.mark.parametrize("chunk, values", [
+    # Patterns win over the glossary term that contains them
+    ("He claimed the Section 10 exemption.", ["10"]),
+    # Several kinds in one chunk come back in text order
+    ("Section 260-A of the Income Tax Act on 31.07.2014 for Rs. 5,000",
+     ["260-A", "ఆదాయపు పన్ను చట్టం", "31.07.2014", "5,000"]),
+    # A section number inside a case reference's list is protected once
+    ("W.P. Nos. 4 and 5 of 2010 under Section 5", ["4", "5", "2010", "5"]),
+])
+def test_overlapping_spans_resolve_to_earlier_source(protector, chunk, values):
+    spans = protector.detect([chunk])[0]
+    assert [value for _, _, value in spans] == values
+    assert all(end <= next_start for (_, end, _), (next_start, _, _) in zip(spans, spans[1:]))
+
+
+@pytest.mark.parametrize("chunk, restored", [
+    ("The appeal under Section 260-A is admitted.", "The appeal under Section 260-A is admitted."),
+    ("W.P. No. 1234 of 2010 dated 31.07.2014 for Rs. 50000",
+     "W.P. No. 1234 of 2010 dated 31.07.2014 for Rs. 50000"),
+    ("The Income Tax Act applies.", "The ఆదాయపు పన్ను చట్టం applies."),
+    ("Nothing to protect here.", "Nothing to protect here."),
+])
+def test_protect_restore_round_trip(protector, chunk, restored):
+    protected = protector.protect(chunk, protector.detect([chunk])[0])
+    assert "260-A" not in protected.text and "50000" not in protected.text
+    assert protected.restore(protected.text) == (restored, [])
+
+
+def test_connectives_are_left_to_the_model(protector):
+    chunk = "I.T.T.A.Nos.10, 12 and 19 of 1999 under Sections 132(4A) and 158BC"
+    protected = protector.protect(chunk, protector.detect([chunk])[0])
+    assert protected.text == "I.T.T.A.Nos.⟦1⟧, ⟦2⟧ and ⟦3⟧ of ⟦4⟧ under Sections ⟦5⟧ and ⟦6⟧"
+    restored, missing = protected.restore("ఐ.టి.టి.ఎ.నెం. ⟦4⟧ సంవత్సరపు ⟦1⟧, ⟦2⟧ మరియు ⟦3⟧ సెక్షన్లు ⟦5⟧ మరియు ⟦6⟧")
+    assert restored == "ఐ.టి.టి.ఎ.నెం. 1999 సంవత్సరపు 10, 12 మరియు 19 సెక్షన్లు 132(4A) మరియు 158BC"
+    assert missing == []
+
+
+class Entity:
+    def __init__(self, doc, start, end, label):
+        self.start_char = doc.index(start)
+        self.end_char = self.start_char + len(end)
+        self.text = doc[self.start_char:self.end_char]
+        self.label_ = label
+
+
+class StubDoc:
+    def __init__(self, text, ents):
+        self.ents = [Entity(text, value, value, label) for value, label in ents]
+
+
+class StubNLP:
+    """Pipeline that reports fixed entities, standing in for a trained NER model"""
+
+    pipe_names = ["tok2vec", "ner"]
+
+    def __init__(self, entities):
+        self.entities = entities
+        self.batches = []
+
+    def pipe(self, texts, batch_size, disable):
+        self.batches.append((len(texts), batch_size, disable))
+        return [StubDoc(text, self.entities.get(text, [])) for text in texts]
+
+
+NAMED = "Sri J.V. Prasad argued for L. Narasimha Reddy under the Income Tax Act."
+ENTITIES = {NAMED: [("J.V. Prasad", "PERSON"), ("L. Narasimha Reddy", "PERSON"),
+                    ("the Income Tax Act", "ORG")]}
+
+
+def test_names_are_not_protected_by_default(monkeypatch):
+    monkeypatch.delenv("PROTECTED_ENTITY_LABELS", raising=False)
+    nlp = StubNLP(ENTITIES)
+    protector = EntityProtector(nlp, GLOSSARY)
+    assert protector.labels == set()
+    # Only the glossary term is protected
+    assert [value for _, _, value in protector.detect([NAMED])[0]] == ["ఆదాయపు పన్ను చట్టం"]
+    assert nlp.batches == []
+
+
+@pytest.mark.parametrize("labels, values", [
+    (["PERSON"], ["J.V. Prasad", "L. Narasimha Reddy", "ఆదాయపు పన్ను చట్టం"]),
+    # Glossary terms win over an overlapping entity
+    (["PERSON", "ORG"], ["J.V. Prasad", "L. Narasimha Reddy", "ఆదాయపు పన్ను చట్టం"]),
+])
+def test_ner_entities_with_configured_labels(labels, values):
+    nlp = StubNLP(ENTITIES)
+    protector = EntityProtector(nlp, GLOSSARY, labels=labels, batch_size=8)
+    spans = protector.detect([NAMED, "No names here."])
+    assert [value for _, _, value in spans[0]] == values
+    assert spans[1] == []
+    # Both chunks go through one nlp.pipe call with only the NER components enabled
+    assert nlp.batches == [(2, 8, [])]
+
+
+def test_labels_from_environment(monkeypatch):
+    monkeypatch.setenv("PROTECTED_ENTITY_LABELS", "PERSON, ORG")
+    assert EntityProtector(StubNLP({}), GLOSSARY).labels == {"PERSON", "ORG"}
+
+
+def test_restore_reports_missing_and_tolerates_spacing(protector):
+    chunk = "Under Section 260-A on 31.07.2014 for Rs. 50000"
+    protected = protector.protect(chunk, protector.detect([chunk])[0])
+    assert protected.text == "Under Section ⟦1⟧ on ⟦2⟧ for Rs. ⟦3⟧"
+    restored, missing = protected.restore("సెక్షన్ ⟦ 1 ⟧ రూ. ⟦3⟧ ⟦9⟧")
+    assert restored == "సెక్షన్ 260-A రూ. 50000 ⟦9⟧"
+    assert missing == [2]
+
+
+def test_chunk_with_placeholder_characters_is_not_protected(protector):
+    chunk = "Section 260-A ⟦1⟧"
+    protected = protector.protect(chunk, protector.detect([chunk])[0])
+    assert protected.text == chunk
+    assert protected.values == {}
+
+
+class DroppingModel(SimulatedChatModel):
+    """Echoes the input but loses every placeholder"""
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        result = super()._generate(messages, stop, run_manager, **kwargs)
+        message = result.generations[0].message
+        message.content = PLACEHOLDER_RE.sub("", message.content)
+        return result
+
+
+class OverBudgetModel(SimulatedChatModel):
+    """Counts calls and stops the agent as if the chunk cap had been hit"""
+
+    calls: int = 0
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls += 1
+        raise BudgetExceeded("chunk token budget exceeded")
+
+
+def test_lost_placeholders_are_retried_without_protection(make_translator):
+    translator = make_translator(llm=DroppingModel())
+    tracker = UsageTracker()
+    translation = translator.translate_chunk("The appeal under Section 260-A is admitted.", tracker)
+    assert translation == "[te] The appeal under Section 260-A is admitted."
+    assert tracker.fallbacks == 0
+
+
+def test_retry_stays_on_fallback_model(make_translator):
+    llm = OverBudgetModel()
+    translator = make_translator(llm=llm, fallback_llm=DroppingModel())
+    tracker = UsageTracker()
+    translation = translator.translate_chunk("The appeal under Section 260-A is admitted.", tracker)
+    assert translation == "[te] The appeal under Section 260-A is admitted."
+    assert llm.calls == 1
+    assert tracker.chunks[0]["fallback"] == "chunk token budget exceeded"
+    assert tracker.fallbacks == 1
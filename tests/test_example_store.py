@@ -0,0 +1,132 @@
+import threading
+import time
+
+from example_store import CircuitBreaker, ExampleStore, InMemoryCollection, normalize_query
+
+
+class WordEncoder:
+    """Bag-of-letters embedding, enough to rank the fixtures below"""
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, sentences):
+        self.calls.append(list(sentences))
+        return [[float(s.lower().count(c)) for c in "abcdefghijklmnopqrstuvwxyz"] for s in sentences]
+
+
+PAIRS = [
+    ("The appeal is dismissed.", "అప్పీలు కొట్టివేయబడింది."),
+    ("The writ petition is allowed.", "రిట్ పిటిషన్ అనుమతించబడింది."),
+    ("No order as to costs.", "ఖర్చుల విషయంలో ఎటువంటి ఉత్తర్వు లేదు."),
+]
+
+
+class CountingCollection(InMemoryCollection):
+    def __init__(self, documents, delay=0.0, fail=False):
+        super().__init__(documents)
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+        self.pipelines = []
+        self._lock = threading.Lock()
+
+    def aggregate(self, pipeline, **kwargs):
+        with self._lock:
+            self.calls += 1
+            self.pipelines.append(pipeline)
+        if self.delay:
+            time.sleep(self.delay)
+        if self.fail:
+            raise Exception("cluster unavailable")
+        return super().aggregate(pipeline, **kwargs)
+
+
+def make_store(delay=0.0, fail=False, timeout=1.0, breaker=None, k=2):
+    encoder = WordEncoder()
+    collection = CountingCollection(InMemoryCollection.from_pairs(PAIRS, encoder).documents, delay, fail)
+    encoder.calls.clear()
+    store = ExampleStore(collection, encoder, k=k, timeout=timeout, breaker=breaker or CircuitBreaker(3, 0.2))
+    return store, collection, encoder
+
+
+def test_projection_returns_only_text_fields():
+    store, collection, _ = make_store()
+    examples = store.get_examples("The appeal is dismissed.", k=1)
+    assert examples == [{"The appeal is dismissed.": "అప్పీలు కొట్టివేయబడింది."}]
+    project = collection.pipelines[0][-1]["$project"]
+    assert project == {"_id": 0, "english_text": 1, "telugu_text": 1}
+
+
+def test_batch_deduplicates_and_encodes_once():
+    store, collection, encoder = make_store()
+    results = store.get_examples_batch(["The appeal is dismissed.", "The appeal is  dismissed.", "No order as to costs."])
+    assert results[0] == results[1]
+    assert collection.calls == 2
+    assert len(encoder.calls) == 1
+
+
+def test_cache_hits_match_normalized_tool_input():
+    store, collection, _ = make_store()
+    store.prefetch(["The appeal is dismissed."], wait=True)
+    assert collection.calls == 1
+    store.get_examples("English:  The appeal is dismissed. ")
+    store.get_examples('"The appeal is dismissed."')
+    assert collection.calls == 1
+
+
+def test_normalize_query():
+    assert normalize_query("  English: The  appeal\nis dismissed. ") == "The appeal is dismissed."
+
+
+def test_breaker_opens_after_failures_and_skips_calls():
+    store, collection, _ = make_store(fail=True)
+    for i in range(3):
+        assert store.get_examples(f"sentence {i}") == []
+    assert store.breaker.state == "open"
+    calls = collection.calls
+    assert store.get_examples("another sentence") == []
+    assert collection.calls == calls
+
+
+def test_slow_calls_count_as_failures():
+    store, _, _ = make_store(delay=0.05, timeout=0.01)
+    for i in range(3):
+        store.get_examples(f"sentence {i}")
+    time.sleep(0.1)
+    assert store.breaker.state == "open"
+
+
+def test_breaker_recovers_after_reset_timeout():
+    store, collection, _ = make_store(fail=True)
+    for i in range(3):
+        store.get_examples(f"sentence {i}")
+    assert store.breaker.state == "open"
+    collection.fail = False
+    time.sleep(0.25)
+    assert store.breaker.state == "half-open"
+    assert store.get_examples("The appeal is dismissed.") != []
+    assert store.breaker.state == "closed"
+
+
+def test_half_open_lets_a_single_probe_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    assert not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+
+def test_hanging_search_is_cut_off_at_deadline():
+    store, _, _ = make_store(delay=2.0, timeout=0.1)
+    start = time.monotonic()
+    assert store.get_examples_batch(["The appeal is dismissed.", "No order as to costs."]) == [[], []]
+    assert time.monotonic() - start < 1.0
+
+
+def test_no_collection_returns_empty():
+    store = ExampleStore(None, None)
+    assert store.get_examples("anything") == []
@@ -0,0 +1,76 @@
+import io
+
+import pytest
+
+from fake_llm import SimulatedChatModel
+from incremental import ERROR_PREFIX, dump_pairs, load_pairs, plan_incremental
+
+PREVIOUS = [
+    ("The appeal is dismissed.", "[te] A"),
+    ("The writ petition is allowed.", "[te] B"),
+    ("There shall be no order as to costs.", "[te] C"),
+]
+A, B, C = (english for english, _ in PREVIOUS)
+
+
+@pytest.mark.parametrize("chunks, plan", [
+    # Unchanged
+    ([A, B, C], ["[te] A", "[te] B", "[te] C"]),
+    # Moved: found by hash outside the aligned run
+    ([C, A, B], ["[te] C", "[te] A", "[te] B"]),
+    # Edited
+    ([A, "The writ petition is dismissed.", C], ["[te] A", None, "[te] C"]),
+    # Inserted
+    ([A, "Heard both sides.", B, C], ["[te] A", None, "[te] B", "[te] C"]),
+    # Deleted
+    ([A, C], ["[te] A", "[te] C"]),
+    # Whitespace-only edits
+    (["The  appeal is\ndismissed. ", B, C], ["[te] A", "[te] B", "[te] C"]),
+    ([], []),
+])
+def test_plan_incremental(chunks, plan):
+    assert plan_incremental(chunks, PREVIOUS) == plan
+
+
+def test_previous_errors_are_retranslated():
+    previous = [PREVIOUS[0], (B, f"{ERROR_PREFIX} {B}]"), PREVIOUS[2]]
+    assert plan_incremental([A, B, C], previous) == ["[te] A", None, "[te] C"]
+
+
+def test_load_pairs_sources(tmp_path):
+    data = dump_pairs(PREVIOUS)
+    path = tmp_path / "pairs.json"
+    path.write_text(data, encoding="utf-8")
+    for source in (data, data.encode("utf-8"), io.BytesIO(data.encode("utf-8")),
+                   io.StringIO(data), str(path)):
+        assert load_pairs(source) == PREVIOUS
+
+
+class RecordingModel(SimulatedChatModel):
+    """Records the English text of every call"""
+
+    seen: list = []
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.seen.append(str(messages[-1].content))
+        return super()._generate(messages, stop, run_manager, **kwargs)
+
+
+def test_translate_text_incremental_only_sends_pending_chunks(make_translator):
+    llm = RecordingModel(seen=[])
+    translator = make_translator(llm=llm)
+    text = " ".join([A, "Heard both sides.", B, "The writ petition is dismissed."])
+
+    pairs, report = translator.translate_text_incremental(text, PREVIOUS)
+
+    assert pairs == [
+        (A, "[te] A"),
+        ("Heard both sides.", "[te] Heard both sides."),
+        (B, "[te] B"),
+        ("The writ petition is dismissed.", "[te] The writ petition is dismissed."),
+    ]
+    assert sorted(llm.seen) == ["English: Heard both sides.", "English: The writ petition is dismissed."]
+    assert report["total_chunks"] == 4
+    assert report["reused"] == 2
+    assert [item["index"] for item in report["retranslated"]] == [1, 3]
+    assert report["usage"]["llm_calls"] == 2
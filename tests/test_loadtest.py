@@ -0,0 +1,43 @@
+import pytest
+
+from fake_llm import SimulatedChatModel
+from loadtest import parse_mix, percentile, run_level
+
+
+@pytest.mark.parametrize("values, pct, expected", [
+    ([], 50, None),
+    ([3.0], 99, 3.0),
+    ([1, 2, 3, 4], 50, 2),
+    ([4, 3, 2, 1], 75, 3),
+    ([1, 2, 3, 4], 100, 4),
+    (list(range(1, 101)), 95, 95),
+    (list(range(1, 101)), 99, 99),
+    ([1, 2], 1, 1),
+])
+def test_percentile_is_nearest_rank(values, pct, expected):
+    assert percentile(values, pct) == expected
+
+
+@pytest.mark.parametrize("spec, mix", [
+    ("2:0.6,20:0.3,200:0.1", [(2, 0.6), (20, 0.3), (200, 0.1)]),
+    ("5", [(5, 1.0)]),
+    ("5:,10:2", [(5, 1.0), (10, 2.0)]),
+])
+def test_parse_mix(spec, mix):
+    assert parse_mix(spec) == mix
+
+
+def test_run_level_separates_queue_wait_from_service(make_translator):
+    translators = [make_translator(llm=SimulatedChatModel(latency=0.01))]
+    documents = ["The appeal is dismissed. The writ petition is allowed."] * 4
+    level = run_level(translators, documents, concurrency=2)
+
+    assert level["failed_documents"] == 0
+    assert level["chunks"] == 8
+    assert level["sessions"] == 1
+    for key in ("chunk", "queue_wait", "service"):
+        assert level[key]["p50"] is not None
+    assert level["service"]["p50"] >= 0.01
+    assert level["chunk"]["p99"] >= level["service"]["p99"]
+    # The wrapper is removed again
+    assert "submit" not in vars(translators[0].scheduler)
@@ -0,0 +1,71 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import io
+
+import fitz
+import pytest
+
+import ocr
+
+
+class BrokenPool:
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_exception(BrokenProcessPool("worker died"))
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+@pytest.fixture
+def thread_pool(monkeypatch):
+    pool = ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(ocr, "get_pool", lambda: pool)
+    yield pool
+    pool.shutdown()
+
+
+def fail_ocr(pdf_bytes, page_numbers, dpi, language):
+    raise RuntimeError("No tesseract language data found")
+
+
+def test_ocr_failure_keeps_text_layer(make_translator, make_pdf, thread_pool, monkeypatch):
+    monkeypatch.setattr(ocr, "_ocr_pages", fail_ocr)
+    pdf = make_pdf("The appeal is dismissed with costs.", "p. 2")
+    text = make_translator().extract_text_from_pdf(io.BytesIO(pdf))
+    assert "The appeal is dismissed with costs." in text
+    assert "p. 2" in text
+
+
+def test_ocr_failure_without_any_text_raises(make_translator, make_pdf, thread_pool, monkeypatch):
+    monkeypatch.setattr(ocr, "_ocr_pages", fail_ocr)
+    with pytest.raises(Exception, match="no text found"):
+        make_translator().extract_text_from_pdf(io.BytesIO(make_pdf(None)))
+
+
+def test_ocr_results_replace_thin_pages_and_are_cached(make_translator, make_pdf, thread_pool, monkeypatch):
+    calls = []
+
+    def fake_ocr(pdf_bytes, page_numbers, dpi, language):
+        calls.append(list(page_numbers))
+        return {number: f"scanned page {number}" for number in page_numbers}
+
+    monkeypatch.setattr(ocr, "_ocr_pages", fake_ocr)
+    translator = make_translator()
+    pdf = make_pdf("The appeal is dismissed with costs.", None)
+    assert "scanned page 1" in translator.extract_text_from_pdf(io.BytesIO(pdf))
+    assert "scanned page 1" in translator.extract_text_from_pdf(io.BytesIO(pdf))
+    assert calls == [[1]]
+
+
+def test_broken_pool_is_reset(make_pdf, monkeypatch):
+    pool = BrokenPool()
+    monkeypatch.setattr(ocr, "_pool", pool)
+    pdf = make_pdf(None)
+    doc = fitz.open(stream=pdf, filetype="pdf")
+    try:
+        assert ocr.ocr_pages(pdf, doc, [0], ocr.OCRCache(directory="")) == {}
+    finally:
+        doc.close()
+    assert ocr._pool is None
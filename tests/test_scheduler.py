@@ -0,0 +1,133 @@
+from concurrent.futures import wait
+import threading
+import time
+
+import pytest
+
+from scheduler import PRIORITY_BATCH, PRIORITY_INTERACTIVE, LLMScheduler
+
+
+class Gate:
+    """Holds every worker of a scheduler busy until opened"""
+
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        self.job = scheduler.create_job(user="gate", priority=PRIORITY_BATCH)
+        self._open = threading.Event()
+        self._started = threading.Semaphore(0)
+        self.futures = [scheduler.submit(self.job, self._hold) for _ in range(scheduler.max_concurrency)]
+        for _ in range(scheduler.max_concurrency):
+            assert self._started.acquire(timeout=5)
+
+    def _hold(self):
+        self._started.release()
+        self._open.wait(5)
+
+    def open(self):
+        self._open.set()
+        wait(self.futures, timeout=5)
+        self.scheduler.close_job(self.job)
+
+
+def record(order, label):
+    def task():
+        order.append(label)
+        time.sleep(0.001)
+    return task
+
+
+def test_global_cap_is_never_exceeded():
+    scheduler = LLMScheduler(max_concurrency=3)
+    lock = threading.Lock()
+    running = [0]
+    peak = [0]
+
+    def task():
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.01)
+        with lock:
+            running[0] -= 1
+
+    jobs = [scheduler.create_job(user=f"user-{i}") for i in range(4)]
+    futures = [scheduler.submit(job, task) for job in jobs for _ in range(10)]
+    wait(futures, timeout=10)
+    assert all(future.done() for future in futures)
+    assert peak[0] == 3
+
+
+def test_short_interactive_job_overtakes_large_batch_job():
+    scheduler = LLMScheduler(max_concurrency=1)
+    gate = Gate(scheduler)
+    order = []
+    batch = scheduler.create_job(user="bulk", priority=PRIORITY_BATCH, total=200)
+    batch_futures = [scheduler.submit(batch, record(order, "batch")) for _ in range(200)]
+    interactive = scheduler.create_job(user="alice", priority=PRIORITY_INTERACTIVE, total=3)
+    interactive_futures = [scheduler.submit(interactive, record(order, "interactive")) for _ in range(3)]
+
+    gate.open()
+    wait(interactive_futures, timeout=10)
+    last = max(i for i, label in enumerate(order) if label == "interactive")
+    assert order[:last + 1].count("batch") <= 3
+    scheduler.close_job(batch)
+    wait(batch_futures, timeout=10)
+
+
+@pytest.mark.parametrize("jobs_per_user", [(1, 1), (3, 1)])
+def test_users_get_equal_shares(jobs_per_user):
+    scheduler = LLMScheduler(max_concurrency=1)
+    gate = Gate(scheduler)
+    order = []
+    jobs = []
+    for user, count in zip(("a", "b"), jobs_per_user):
+        for _ in range(count):
+            job = scheduler.create_job(user=user, priority=PRIORITY_BATCH, total=100)
+            for _ in range(100):
+                scheduler.submit(job, record(order, user))
+            jobs.append(job)
+
+    gate.open()
+    deadline = time.monotonic() + 10
+    while len(order) < 60 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    dispatched = order[:60]
+    assert abs(dispatched.count("a") - dispatched.count("b")) <= 4
+    for job in jobs:
+        scheduler.close_job(job)
+
+
+def test_close_job_cancels_queued_tasks():
+    scheduler = LLMScheduler(max_concurrency=1)
+    gate = Gate(scheduler)
+    job = scheduler.create_job()
+    futures = [scheduler.submit(job, lambda: "ran") for _ in range(5)]
+
+    scheduler.close_job(job)
+    assert all(future.cancelled() for future in futures)
+    done, _ = wait(futures, timeout=1)
+    assert len(done) == 5
+    assert scheduler.job_stats(job.job_id) is None
+    with pytest.raises(Exception, match="closed"):
+        scheduler.submit(job, lambda: "ran")
+    gate.open()
+
+
+def test_job_stats_eta_once_task_time_is_known():
+    scheduler = LLMScheduler(max_concurrency=1)
+    gate = Gate(scheduler)
+    job = scheduler.create_job(total=4)
+    futures = [scheduler.submit(job, time.sleep, 0.01) for _ in range(4)]
+
+    # The gate task has not finished, so there is no task time yet
+    stats = scheduler.job_stats(job.job_id)
+    assert stats["queued"] == 4
+    assert stats["eta_seconds"] is None
+
+    gate.open()
+    wait(futures[:1], timeout=5)
+    scheduler.submit(job, time.sleep, 0.01)
+    stats = scheduler.job_stats(job.job_id)
+    assert stats["eta_seconds"] is not None and stats["eta_seconds"] > 0
+    wait(futures, timeout=5)
+    scheduler.close_job(job)
@@ -0,0 +1,123 @@
+from contextlib import ExitStack
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from fake_llm import SimulatedChatModel
+from server import create_app
+
+TEXT = "The appeal is dismissed with costs. The writ petition is allowed. There shall be no order as to costs."
+
+
+@pytest.fixture
+def make_client(make_translator):
+    with ExitStack() as stack:
+
+        def make(**llm_options):
+            app = create_app(make_translator(llm=SimulatedChatModel(**llm_options)))
+            return stack.enter_context(TestClient(app))
+
+        yield make
+
+
+def read_events(client, job_id):
+    """Parse the SSE stream of a job into (event, data) pairs"""
+    events = []
+    with client.stream("GET", f"/jobs/{job_id}/events") as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        event = None
+        for line in response.iter_lines():
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: "):
+                events.append((event, json.loads(line[len("data: "):])))
+    return events
+
+
+def test_text_job_streams_chunks_then_done(make_client):
+    client = make_client()
+    response = client.post("/jobs", data={"text": TEXT, "user": "alice", "priority": "interactive"})
+    assert response.status_code == 200
+    job_id = response.json()["job_id"]
+
+    events = read_events(client, job_id)
+    names = [event for event, _ in events]
+    assert names == ["chunk"] * (len(names) - 1) + ["done"]
+    chunks = [data for event, data in events if event == "chunk"]
+    assert [chunk["index"] for chunk in chunks] == list(range(len(chunks)))
+    assert chunks[0]["english"] == "The appeal is dismissed with costs."
+    assert chunks[0]["telugu"] == "[te] The appeal is dismissed with costs."
+    assert events[-1][1]["usage"]["llm_calls"] >= len(chunks)
+
+    result = client.get(f"/jobs/{job_id}/result").json()
+    assert result["translation"] == events[-1][1]["translation"]
+    assert len(result["pairs"]) == len(chunks)
+    assert client.get(f"/jobs/{job_id}").json()["status"] == "done"
+
+
+def test_pdf_job(make_client, make_pdf):
+    client = make_client()
+    pdf = make_pdf("The appeal is dismissed with costs.")
+    response = client.post("/jobs", files={"file": ("order.pdf", pdf, "application/pdf")})
+    assert response.status_code == 200
+    job_id = response.json()["job_id"]
+
+    assert read_events(client, job_id)[-1][0] == "done"
+    pairs = client.get(f"/jobs/{job_id}/result").json()["pairs"]
+    assert pairs == [{"english": "The appeal is dismissed with costs.",
+                      "telugu": "[te] The appeal is dismissed with costs."}]
+
+
+@pytest.mark.parametrize("files, data", [
+    ({"file": ("order.pdf", b"%PDF", "application/pdf")}, {"text": TEXT}),
+    (None, {}),
+    (None, {"text": TEXT, "priority": "urgent"}),
+])
+def test_bad_requests_are_rejected(make_client, files, data):
+    response = make_client().post("/jobs", files=files, data=data)
+    assert response.status_code == 400
+
+
+def test_result_is_409_until_job_finishes(make_client):
+    client = make_client(latency=0.2)
+    job_id = client.post("/jobs", data={"text": TEXT}).json()["job_id"]
+
+    response = client.get(f"/jobs/{job_id}/result")
+    assert response.status_code == 409
+    assert client.get(f"/jobs/{job_id}").json()["status"] in ("queued", "running")
+
+    assert read_events(client, job_id)[-1][0] == "done"
+    assert client.get(f"/jobs/{job_id}/result").status_code == 200
+
+
+def test_llm_failure_ends_with_error_event(make_client):
+    client = make_client(error_rate=1.0)
+    job_id = client.post("/jobs", data={"text": TEXT}).json()["job_id"]
+
+    event, data = read_events(client, job_id)[-1]
+    assert event == "error"
+    assert "failed" in data["error"]
+    status = client.get(f"/jobs/{job_id}").json()
+    assert status["status"] == "failed"
+    assert status["error"] == data["error"]
+    assert client.get(f"/jobs/{job_id}/result").status_code == 409
+
+
+def test_unknown_job_is_404(make_client):
+    client = make_client()
+    assert client.get("/jobs/missing").status_code == 404
+    assert client.get("/jobs/missing/events").status_code == 404
+
+
+def test_finished_jobs_expire_on_reads(make_client, monkeypatch):
+    client = make_client()
+    first = client.post("/jobs", data={"text": TEXT}).json()["job_id"]
+    second = client.post("/jobs", data={"text": TEXT}).json()["job_id"]
+    assert read_events(client, first)[-1][0] == "done"
+    assert read_events(client, second)[-1][0] == "done"
+
+    monkeypatch.setattr("server.JOB_TTL_SECONDS", -1)
+    assert client.get(f"/jobs/{first}").status_code == 404
+    assert client.app.state.jobs == {}